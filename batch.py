@@ -0,0 +1,260 @@
+'''Translates a JSONL file of regular expressions as a resumable batch job.
+
+Each input line is either a JSON string (the pattern itself) or a JSON
+object with the pattern under 'field'. Each input line gets exactly one
+output line: the input object with a 'translation' key added, or with an
+'error' key and the line's byte 'offset' in the input if it could not be
+translated. Lines that aren't JSON objects or strings (including blank
+lines) are reported with their raw text under 'line'.
+
+The job periodically records a checkpoint next to the output file, holding
+the input offset up to which all results have been written, along with the
+input file's size, modification time, and a hash of its first block.
+Rerunning the same command resumes from the last checkpoint; if the input
+file has changed since, the job refuses to run until it is restarted.
+
+usage: python batch.py input.jsonl output.jsonl [options]
+'''
+
+import os
+import sys
+import json
+import mmap
+import time
+import hashlib
+import argparse
+import functools
+import multiprocessing
+
+import speakregex
+
+
+def read_lines(path, offset=0):
+    '''Yields (end offset, line) pairs from a file, starting at 'offset'.
+
+    The file is memory-mapped rather than read, so only the pages we are
+    currently looking at need to be in memory.
+    '''
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if offset >= size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            while offset < size:
+                end = mapped.find(b'\n', offset)
+                end = size if end == -1 else end + 1
+                yield end, mapped[offset:end]
+                offset = end
+
+
+def translate_line(line, offset, field='pattern', max_depth=None):
+    '''Translates one input line, returning the output line as bytes.
+
+    offset: The offset of the line in the input, for error records.
+    '''
+    text = line.decode('utf-8', 'replace').rstrip('\r\n')
+    try:
+        record = json.loads(text)
+        if isinstance(record, str):
+            record = {field: record}
+        elif not isinstance(record, dict):
+            raise ValueError("not an object or a string")
+    except ValueError as exc:
+        record = {'offset': offset, 'line': text,
+                  'error': "unreadable line: {0}".format(exc)}
+    else:
+        try:
+            summary = speakregex.summarize(record[field], max_depth)
+            record['translation'] = str(summary)
+        except Exception as exc:
+            record['offset'] = offset
+            record['error'] = "{0}: {1}".format(type(exc).__name__, exc)
+    return json.dumps(record).encode('utf-8') + b'\n'
+
+
+def translate_entry(entry, field='pattern', max_depth=None):
+    '''Translates an (end offset, line) pair, keeping the offset.'''
+    end, line = entry
+    return end, translate_line(line, end - len(line), field, max_depth)
+
+
+def checkpoint_path(output_path):
+    return output_path + '.checkpoint'
+
+
+def input_identity(path, head_size=65536):
+    '''Returns the size, modification time and head hash of a file.'''
+    stat = os.stat(path)
+    with open(path, 'rb') as file:
+        head = hashlib.sha1(file.read(head_size)).hexdigest()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'head': head}
+
+
+def load_checkpoint(path, identity):
+    '''Returns the last checkpoint saved at 'path', or a fresh one.
+
+    identity: The current identity of the input file (see
+    'input_identity'). Raises ValueError if the checkpoint was taken from a
+    different input.
+    '''
+    try:
+        with open(path) as file:
+            checkpoint = json.load(file)
+    except FileNotFoundError:
+        return {'input': identity, 'input_offset': 0, 'output_offset': 0,
+                'count': 0}
+    if checkpoint.get('input') != identity:
+        raise ValueError("the input has changed since the checkpoint in {0} "
+                         "was taken; rerun with --restart to start over"
+                         .format(path))
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    '''Atomically replaces the checkpoint file.'''
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump(checkpoint, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{0}:{1:02}:{2:02}".format(hours, minutes, seconds)
+
+
+def report_progress(checkpoint, total, start, stream):
+    '''Prints a one-line throughput/ETA report, overwriting the last one.
+
+    start: The checkpoint this run resumed from, plus the time it started.
+    '''
+    elapsed = max(time.monotonic() - start['time'], 1e-9)
+    done = checkpoint['input_offset'] - start['input_offset']
+    rate = (checkpoint['count'] - start['count']) / elapsed
+    remaining = total - checkpoint['input_offset']
+    eta = remaining * elapsed / done if done else 0
+    line = "\r{0:.1%} ({1} patterns), {2:.0f} patterns/s, ETA {3}"
+    stream.write(line.format(checkpoint['input_offset'] / total if total
+                             else 1, checkpoint['count'], rate,
+                             format_duration(eta)))
+    stream.flush()
+
+
+def run(input_path, output_path, field='pattern', jobs=None,
+        checkpoint_every=10000, chunksize=256, max_depth=None,
+        progress=sys.stderr):
+    '''Runs (or resumes) a batch translation job.
+
+    input_path: The JSONL file of patterns to translate.
+    output_path: The JSONL file to write translations to.
+    field: The key holding the pattern in each input object.
+    jobs: The number of worker processes; defaults to the number of CPUs.
+    checkpoint_every: How many results to buffer between checkpoints.
+    chunksize: How many lines to send to a worker at a time.
+    max_depth: As for 'speakregex.summarize'.
+    progress: A stream for progress reports, or None.
+
+    Returns the final checkpoint. Raises ValueError if there is a
+    checkpoint for a different input file, or if the output file is missing
+    or shorter than the checkpoint says.
+    '''
+    state_path = checkpoint_path(output_path)
+    identity = input_identity(input_path)
+    checkpoint = load_checkpoint(state_path, identity)
+    total = identity['size']
+    start = dict(checkpoint, time=time.monotonic())
+    written = (os.path.getsize(output_path) if os.path.exists(output_path)
+               else 0)
+    if written < checkpoint['output_offset']:
+        raise ValueError("{0} is missing results recorded in the checkpoint "
+                         "in {1}; rerun with --restart to start over"
+                         .format(output_path, state_path))
+    # Anything written after the last checkpoint is discarded and redone.
+    mode = 'r+b' if os.path.exists(output_path) else 'wb'
+    with open(output_path, mode) as output:
+        output.truncate(checkpoint['output_offset'])
+        output.seek(checkpoint['output_offset'])
+        entries = read_lines(input_path, checkpoint['input_offset'])
+        translate = functools.partial(translate_entry, field=field,
+                                      max_depth=max_depth)
+        pool = multiprocessing.Pool(jobs) if jobs != 1 else None
+        try:
+            # imap keeps results in input order, so the offset of the last
+            # result buffered is always safe to resume from.
+            results = (pool.imap(translate, entries, chunksize) if pool
+                       else map(translate, entries))
+            buffer = []
+            end = None
+            for end, result in results:
+                buffer.append(result)
+                if len(buffer) >= checkpoint_every:
+                    commit(output, buffer, end, checkpoint, state_path)
+                    if progress is not None:
+                        report_progress(checkpoint, total, start, progress)
+            if end is not None:
+                commit(output, buffer, end, checkpoint, state_path)
+        finally:
+            if pool is not None:
+                pool.terminate()
+    if progress is not None:
+        report_progress(checkpoint, total, start, progress)
+        progress.write("\n")
+    return checkpoint
+
+
+def commit(output, buffer, input_offset, checkpoint, state_path):
+    '''Writes buffered results in one go, then records a checkpoint.'''
+    output.write(b''.join(buffer))
+    output.flush()
+    os.fsync(output.fileno())
+    checkpoint['input_offset'] = input_offset
+    checkpoint['output_offset'] = output.tell()
+    checkpoint['count'] += len(buffer)
+    save_checkpoint(state_path, checkpoint)
+    buffer.clear()
+
+
+def positive_int(text):
+    '''Argument type for counts that must be at least 1.'''
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Translate a JSONL file of regular expressions.")
+    parser.add_argument('input', help="the JSONL file of patterns")
+    parser.add_argument('output', help="the JSONL file to write")
+    parser.add_argument('--field', default='pattern',
+                        help="the key holding each pattern (default: pattern)")
+    parser.add_argument('--jobs', type=positive_int, default=None,
+                        help="number of worker processes (default: all CPUs)")
+    parser.add_argument('--checkpoint-every', type=positive_int,
+                        default=10000,
+                        help="results written between checkpoints")
+    parser.add_argument('--chunksize', type=positive_int, default=256,
+                        help="lines sent to a worker at a time")
+    parser.add_argument('--max-depth', type=int, default=None,
+                        help="only translate this many levels of each pattern")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore any checkpoint and start over")
+    parser.add_argument('--quiet', action='store_true',
+                        help="don't print progress")
+    args = parser.parse_args(argv)
+    if args.restart and os.path.exists(checkpoint_path(args.output)):
+        os.remove(checkpoint_path(args.output))
+    try:
+        run(args.input, args.output, args.field, args.jobs,
+            args.checkpoint_every, args.chunksize, args.max_depth,
+            None if args.quiet else sys.stderr)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+'''Times translating alternations of increasing width.
+
+Each size is timed twice: once for plain words, which are gathered into a
+single word list, and once for alternatives with a non-literal part, which
+are translated one by one. Both should grow linearly with the width.
+
+usage: python bench_alternation.py [largest width]
+'''
+
+import sys
+import time
+
+import speakregex
+
+
+def time_translation(regex_string):
+    '''Returns the seconds spent parsing and rendering a regex, uncached.'''
+    speakregex.tree_cache.cache_clear()
+    started = time.perf_counter()
+    tree = speakregex.parse_tree(regex_string)
+    parsed = time.perf_counter()
+    tree.render()
+    rendered = time.perf_counter()
+    return parsed - started, rendered - parsed
+
+
+def main(largest=100000):
+    print("{0:>8} {1:>10} {2:>10} {3:>10} {4:>10}".format(
+        "width", "words", "", "mixed", ""))
+    print("{0:>8} {1:>10} {2:>10} {1:>10} {2:>10}".format(
+        "", "parse (s)", "render (s)"))
+    width = 10
+    while width <= largest:
+        words = '|'.join("word{0}".format(i) for i in range(width))
+        mixed = '|'.join(r"word{0}\d".format(i) for i in range(width))
+        times = time_translation(words) + time_translation(mixed)
+        print("{0:>8,} {1:>10.4f} {2:>10.4f} {3:>10.4f} {4:>10.4f}".format(
+            width, *times))
+        width *= 10
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
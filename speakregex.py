@@ -1,39 +1,206 @@
 import io
 import re
 import sys
+import hashlib
 import textwrap
-import functools
+import threading
+import collections
 import tree
 
+# Bits of the 'flags' field of a RegexNode.
+SUBLIST = 1
+VANISHING = 2
+SUBORDINATE = 4
+COORDINATE = 8
+PARENTHESIZED = 16
+COLLAPSED = 32
+NEGATED = 64
+SEPARATED = 128
+
+
+def flag(bit, doc):
+    '''Returns a boolean property backed by one bit of a node's flags.'''
+    def get_flag(node):
+        return bool(node.flags & bit)
+    def set_flag(node, value):
+        if value:
+            node.flags |= bit
+        else:
+            node.flags &= ~bit
+    return property(get_flag, set_flag, doc=doc)
+
+
+def argument(text):
+    '''Converts an argument from the debug tree to an int if possible.
+
+    Other arguments (category names, 'None', etc.) are interned, since the
+    same few strings turn up over and over again.
+    '''
+    try:
+        return int(text)
+    except ValueError:
+        return sys.intern(text)
+
+
 class RegexNode(tree.Node):
+    __slots__ = ('token', 'intro', 'outro', 'desc', 'flags')
+
     def __init__(self, data, *children):
         super().__init__(data, *children)
         data = data.split()
-        self.token = data[0]
-        self.data = data[1:]
+        self.token = sys.intern(data[0])
+        self.data = [argument(arg) for arg in data[1:]]
         self.intro = ""
         self.outro = ""
-        self.sublist = False
-        self.vanishing = False
-        self.subordinate = False
-        self.coordinate = False
-        self.parenthesized = False
+        self.flags = token_flags.get(self.token, 0)
         self.desc = None
+
+    sublist = flag(SUBLIST, "Whether the node introduces a list.")
+    vanishing = flag(VANISHING, "Whether the leadin vanishes on collapse.")
+    subordinate = flag(SUBORDINATE, "Whether children follow each other.")
+    coordinate = flag(COORDINATE, "Whether children are alternatives.")
+    parenthesized = flag(PARENTHESIZED, "Whether the node is an aside.")
+    collapsed = flag(COLLAPSED, "Whether the only child joins this line.")
+    negated = flag(NEGATED, "Whether a set is a complement.")
+    separated = flag(SEPARATED, "Whether a comma follows it in its list.")
     
-    def __str__(self, depth=0):
-        if self.desc is None:
-            for node in self:
-                node.get_desc()
+    def arrange(self):
+        '''Settles the shape of this node's tree, before any describing.
+
+        Gathers word lists, merges runs of literals, takes the negation out
+        of sets, punctuates lists, and marks which chains of single children
+        collapse into one line. None of this depends on how much of the tree
+        is described later, so every rendering sees the same tree.
+        '''
+        self.gather_words()
+        self.merge_literals()
+        if self.token == 'in':
+            self.take_negation()
+        for child in self.children:
+            child.arrange()
         if len(self.children) > 1:
             self.add_syntax()
-        elif self.sublist:
-            self.attempt_collapse()
-        bullet = "* " if depth else ""
-        self.desc = bullet + self.intro + self.desc
-        descs = textwrap.wrap(self.desc, initial_indent="  " * depth,
-                                  subsequent_indent="  " * (depth + 2))
-        child_descs = [child.__str__(depth+1) for child in self.children]
-        return '\n'.join(descs + child_descs) + self.outro
+        elif self.sublist and self.children:
+            child = self.children[0]
+            self.collapsed = not child.children or child.collapsed
+        return self
+
+    def gather_words(self):
+        '''Replaces an alternation of plain words with a single word list.
+
+        The parser puts the alternatives under a 'branch' node and then an
+        'or' node for each of the rest, as siblings, after any prefix common
+        to all of them. If the children are exactly one such alternation,
+        and the prefix and every alternative consist only of ordinary
+        literals, the whole lot is replaced by one 'words' node listing the
+        full words. (Two alternations in a row are left alone.)
+        '''
+        words = []
+        prefix = ""
+        for child in self.children:
+            if (child.token == ('or' if words else 'branch')
+                and child.children):
+                if not all(plain_literal(node) for node in child.children):
+                    return
+                words.append(prefix + ''.join(literal_text(node)
+                                              for node in child.children))
+            elif not words and plain_literal(child):
+                prefix += literal_text(child)
+            else:
+                return
+        if words:
+            self.clear()
+            self += RegexNode('words')
+            self.children[0].data = words
+
+    def merge_literals(self):
+        '''Merges each run of printable literals among the children.'''
+        children = []
+        for child in self.children:
+            if (children and child.token == children[-1].token == 'literal'
+                and children[-1].data[0] not in special_characters
+                and child.data[0] not in special_characters):
+                children[-1].data.extend(child.data)
+            else:
+                children.append(child)
+        if len(children) < len(self.children):
+            self.clear()
+            for child in children:
+                self += child
+
+    def take_negation(self):
+        '''Replaces a leading 'negate' in a set with the 'negated' flag.'''
+        if self.children and self.children[0].token == 'negate':
+            self.children[0].detach()
+            self.negated = True
+            only_child = self.children[0] if len(self.children) == 1 else None
+            if only_child is not None and only_child.token == 'category':
+                only_child.data[0] = complements[only_child.data[0]]
+
+    def describe(self, levels=None):
+        '''Describes this node and its tree, down to 'levels' levels below it.
+
+        Describing only settles the wording; the shape of the tree was
+        settled by 'arrange'. Each node is described at most once, and
+        rendering only reads the result.
+        '''
+        with tree_lock:
+            self._describe(levels)
+
+    def _describe(self, levels):
+        if self.desc is None:
+            self.get_desc()
+        if self.collapsed or (levels is not None and levels <= 0):
+            return
+        for child in self.children:
+            child._describe(None if levels is None else levels - 1)
+
+    def render(self, width=70, style='text', max_depth=None, folded=None):
+        '''Describes this node's tree if need be, then prints it.
+
+        The node is printed on its own, without the words and punctuation
+        that join it to its siblings.
+
+        width: The width to wrap lines to.
+        style: The name of an output style (see 'styles').
+        max_depth: If given, the children of nodes this many levels down
+        are folded into a one-line digest instead of being described.
+        folded: A list to which each node whose children were folded is
+        appended; the digest refers to the node by its index.
+        '''
+        self.describe(max_depth)
+        return self._render(0, width, styles[style], max_depth, folded)
+
+    def _render(self, depth, width, style, max_depth, folded):
+        intro = self.intro if depth else ""
+        outro = self.outro + ("," if depth and self.separated else "")
+        children = [] if self.collapsed else self.children
+        if max_depth is not None and depth >= max_depth and children:
+            return '\n'.join(style(intro + self.digest(folded), depth,
+                                   width)) + outro
+        descs = style(intro + self.desc, depth, width)
+        child_descs = [child._render(depth+1, width, style, max_depth, folded)
+                       for child in children]
+        return '\n'.join(descs + child_descs) + outro
+
+    def __str__(self):
+        return self.render()
+
+    def digest(self, folded=None):
+        '''Returns this node's description with its children folded away.'''
+        size = self.size()
+        digest = "{0} [{1} element{2} folded".format(self.desc, size,
+                                                    "" if size == 1 else "s")
+        if folded is not None:
+            digest += ", #{0}".format(len(folded))
+            folded.append(self)
+        return digest + "]"
+
+    def size(self):
+        '''Counts the lines that rendering this node's children would print.'''
+        if self.collapsed:
+            return 0
+        return sum(1 + child.size() for child in self.children)
         
     def get_desc(self):
         try:
@@ -42,17 +209,12 @@ class RegexNode(tree.Node):
             self.desc = an_regex.sub('an', desc)
         except KeyError:
             self.desc = "something I don't understand: {0}".format(self.token)
-    
-    def attempt_collapse(self):
-        if not self.sublist:
-            return True
-        elif len(self.children) > 1:
-            return False
-        elif self.children[0].attempt_collapse():
+        if self.collapsed:
+            child = self.children[0]
+            if child.desc is None:
+                child.get_desc()
             self.desc = "" if self.vanishing else self.desc[:-1] + " "
-            self.desc += self.children[0].desc
-            self.children[0].detach()
-            return True
+            self.desc += child.desc
     
     def add_syntax(self):
         nonparen_children = [child for child in self.children
@@ -60,12 +222,15 @@ class RegexNode(tree.Node):
         if not nonparen_children:
             return
         for child in nonparen_children[:-1]:
-            child.outro += ","
+            child.separated = True
         if self.subordinate:
-            for child in nonparen_children[1:]:
-                target = (child if not child.older_sibling.parenthesized
-                          else child.older_sibling)
-                target.intro = "followed by "
+            first, older_sibling = nonparen_children[0], None
+            for child in self.children:
+                if not child.parenthesized and child is not first:
+                    target = (child if not older_sibling.parenthesized
+                              else older_sibling)
+                    target.intro = "followed by "
+                older_sibling = child
         elif self.coordinate:
             nonparen_children[-1].intro = "or "
         
@@ -85,33 +250,33 @@ quotes_regex = re.compile(r'''^r?(["/'])(.*)\1$''')
 
 # Dictionary of special characters that can't be usefully printed.
 special_characters = {
-    '7': 'the alert character',
-    '8': 'a backspace',
-    '9': 'a tab character',
-    '10': 'a newline',
-    '32': 'a space',
-    '34': 'a quotation mark',
-    '92': 'a backslash',
+    7: 'the alert character',
+    8: 'a backspace',
+    9: 'a tab character',
+    10: 'a newline',
+    32: 'a space',
+    34: 'a quotation mark',
+    92: 'a backslash',
 }
 
 # Dictionary of unusual characters that can be usefully printed with other
 # characters, but should be spelled out when by themselves.
 unusual_characters = {
-    '36': 'a dollar sign',
-    '39': 'an apostrophe',
-    '40': 'a left parenthesis',
-    '41': 'a right parenthesis',
-    '44': 'a comma',
-    '59': 'a semicolon',
-    '60': 'a less than sign',
-    '61': 'an equals sign',
-    '62': 'a greater than sign',
-    '91': 'a left bracket',
-    '93': 'a right bracket',
-    '95': 'an underscore',
-    '123': 'a left curly bracket',
-    '124': 'a vertical bar',
-    '125': 'a right curly bracket',
+    36: 'a dollar sign',
+    39: 'an apostrophe',
+    40: 'a left parenthesis',
+    41: 'a right parenthesis',
+    44: 'a comma',
+    59: 'a semicolon',
+    60: 'a less than sign',
+    61: 'an equals sign',
+    62: 'a greater than sign',
+    91: 'a left bracket',
+    93: 'a right bracket',
+    95: 'an underscore',
+    123: 'a left curly bracket',
+    124: 'a vertical bar',
+    125: 'a right curly bracket',
 }
 
 # Category definitions.
@@ -146,9 +311,30 @@ locations = {
     'at_end_string': 'the end of the string',
 }
 
+# Flags for each kind of element. Elements not listed here have none.
+token_flags = {
+    'max_repeat': SUBLIST | SUBORDINATE,
+    'min_repeat': SUBLIST | SUBORDINATE,
+    'in': SUBLIST | VANISHING | COORDINATE,
+    'subpattern': SUBLIST | SUBORDINATE,
+    'assert': SUBLIST | SUBORDINATE | PARENTHESIZED,
+    'assert_not': SUBLIST | SUBORDINATE | PARENTHESIZED,
+    'branch': SUBORDINATE,
+    'or': SUBORDINATE,
+    'groupref_exists': SUBLIST | SUBORDINATE,
+    'start_tree': SUBLIST | SUBORDINATE,
+}
+
+# How many words of an alternation of plain words to list before giving up.
+word_list_limit = 10
+
 # Debug setting. If true, print the parse tree.
 debug = False
 
+# Held while describing trees, which may be shared between threads, and while
+# capturing the compiler's debug output, which goes through sys.stdout.
+tree_lock = threading.RLock()
+
 ## Functions
 
 # Text-handling functions.
@@ -173,9 +359,30 @@ def quoted_chars(*text_ordinals):
     return ''.join(['"'] + [chr(int(ord)) for ord in text_ordinals] + ['"'])
 
 
+def literal_text(node):
+    '''Returns the characters matched by a literal node.'''
+    return ''.join(lookup_char(ordinal) for ordinal in node.data)
+
+
+def wrap_text(desc, depth, width):
+    '''Wraps a description as a bulleted, indented plain text item.'''
+    bullet = "* " if depth else ""
+    return textwrap.wrap(bullet + desc, width,
+                         initial_indent="  " * depth,
+                         subsequent_indent="  " * (depth + 2))
+
+
+def wrap_markdown(desc, depth, width):
+    '''Wraps a description as a Markdown list item.'''
+    if not depth:
+        return textwrap.wrap(desc, width)
+    indent = "  " * (depth - 1)
+    return textwrap.wrap(desc, width, initial_indent=indent + "- ",
+                         subsequent_indent=indent + "  ")
+
+
 # Functions for getting and formatting the parse tree.
 
-@functools.lru_cache()
 def get_debug_tree(regex_string):
     '''Returns the parse tree for a regular expression, as a string.
 
@@ -186,19 +393,26 @@ def get_debug_tree(regex_string):
     Because the regex compiler has a cache, if you attempt to compile the
     same regular expression repeatedly, you won't get the debug info. To
     avoid this problem, we purge the cache every time, and keep a cache for
-    'parse_regex' instead.
+    trees instead.
     '''
-    re.purge()
-    catch_debug_info = io.StringIO()
-    old_stdout = sys.stdout
-    sys.stdout = catch_debug_info
-    fake_regex = re.compile(regex_string, re.DEBUG)
-    sys.stdout = old_stdout
+    with tree_lock:
+        re.purge()
+        catch_debug_info = io.StringIO()
+        old_stdout = sys.stdout
+        sys.stdout = catch_debug_info
+        try:
+            fake_regex = re.compile(regex_string, re.DEBUG)
+        finally:
+            sys.stdout = old_stdout
     return catch_debug_info.getvalue()
     
 
-def parse_tree(regex_string):
-    '''Yields the parse tree for a regular expression.
+def build_tree(regex_string):
+    '''Returns the canonical parse tree for a regular expression.
+
+    The tree still has to be arranged (see 'RegexNode.arrange') before it
+    is described; keys are taken from it before that, since arranging keeps
+    some of what it removes only as flags.
     '''
     tree_strings = get_debug_tree(regex_string).splitlines()
     tree = RegexNode('start_tree')
@@ -213,16 +427,164 @@ def parse_tree(regex_string):
                 pointer = pointer.parent
         pointer += RegexNode(line)
         last_indent = indent
+    canonicalize(tree)
     if debug:
         print('\n'.join(repr(node) for node in tree))
     return tree
+
+
+def transparent(node):
+    '''Whether a node only groups its children without changing them.
+
+    These are non-capturing groups without flags, and repeats of exactly
+    one occurrence.
+    '''
+    if node.token == 'subpattern':
+        return node.data[0] == 'None' and not any(node.data[1:])
+    elif node.token in ('max_repeat', 'min_repeat'):
+        return node.data[:2] == [1, 1]
+    return False
+
+
+def canonicalize(node):
+    '''Rewrites a parse tree in place so that equivalent spellings match.
+
+    Transparent groups are replaced by their children, except where they
+    set an alternation apart from its neighbours. (This is also what takes
+    a conditional match out of the non-capturing group the parser may wrap
+    it in.) Repeats of a fixed count are made greedy, since greed makes no
+    difference to them.
+    '''
+    children = []
+    for child in node.children:
+        canonicalize(child)
+        if child.token == 'min_repeat' and child.data[0] == child.data[1]:
+            child.token = 'max_repeat'
+        alternation = any(grandchild.token == 'branch'
+                          for grandchild in child.children)
+        if transparent(child) and (len(node.children) == 1 or
+                                   not alternation):
+            children.extend(child.children)
+            child.clear()
+        else:
+            children.append(child)
+    node.clear()
+    for child in children:
+        node += child
+    return node
+
+
+def tree_key(node):
+    '''Returns a hash of a parse tree, for use as a cache key.
+
+    A negated set and its plain counterpart must not share a key:
+
+    >>> plain, negated = RegexNode('in'), RegexNode('in')
+    >>> plain += RegexNode('category category_digit')
+    >>> negated += RegexNode('negate None')
+    >>> negated += RegexNode('category category_digit')
+    >>> tree_key(plain) == tree_key(negated)
+    False
+    >>> tree_key(plain) == tree_key(negated.arrange())
+    False
+    '''
+    digest = hashlib.sha1()
+    def feed(node, depth):
+        digest.update("{0}{1} {2} {3}\n".format("  " * depth, node.token,
+                                                node.data, node.flags)
+                      .encode('utf-8'))
+        for child in node.children:
+            feed(child, depth + 1)
+    feed(node, 0)
+    return digest.digest()
+
+
+CacheInfo = collections.namedtuple('CacheInfo',
+                                   'hits raw_hits misses maxsize currsize')
+
+
+class TreeCache(object):
+    '''A cache of parse trees, keyed by the hash of their canonical form.
+
+    Equivalent spellings of a regular expression (quoted or not, with
+    redundant groups or without, etc.) share a single tree. An index of the
+    strings seen so far maps each to its key, so that a repeated string is
+    not parsed again; its hits are the ones a cache keyed on the strings
+    themselves would have scored, and are reported as 'raw_hits'.
+
+    Only raw hits save parsing. Any other hit still compiles and
+    canonicalizes the string to find its key; what it saves is describing
+    the tree again.
+    '''
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.keys = collections.OrderedDict()
+        self.trees = collections.OrderedDict()
+        self.hits = self.raw_hits = self.misses = 0
+
+    def get(self, regex_string, clean_quotes=False):
+        '''Returns the parse tree for a regular expression.
+
+        clean_quotes: If true, removes quotation marks around the regular
+        expression before parsing it.
+        '''
+        with tree_lock:
+            key = self.keys.get((regex_string, clean_quotes))
+            if key in self.trees:
+                self.raw_hits += 1
+            else:
+                cleaned = (check_for_quotes(regex_string) if clean_quotes
+                           else regex_string)
+                tree = build_tree(cleaned)
+                key = tree_key(tree)
+                self.keys[regex_string, clean_quotes] = key
+                if len(self.keys) > self.maxsize:
+                    self.keys.popitem(last=False)
+                if key not in self.trees:
+                    self.misses += 1
+                    self.trees[key] = tree.arrange()
+                    if len(self.trees) > self.maxsize:
+                        self.trees.popitem(last=False)
+                    return tree
+            self.hits += 1
+            self.keys.move_to_end((regex_string, clean_quotes))
+            self.trees.move_to_end(key)
+            return self.trees[key]
+
+    def cache_info(self):
+        '''Reports hits, raw hits (see above), misses, and size.
+
+        'hits' counts every lookup that found a described tree; only the
+        'raw_hits' among them also skipped parsing.
+        '''
+        return CacheInfo(self.hits, self.raw_hits, self.misses, self.maxsize,
+                         len(self.trees))
+
+    def cache_clear(self):
+        with tree_lock:
+            self.keys.clear()
+            self.trees.clear()
+            self.hits = self.raw_hits = self.misses = 0
+
+
+# The cache of parse trees used by 'parse_tree'.
+tree_cache = TreeCache()
+
+
+def parse_tree(regex_string, clean_quotes=False):
+    '''Returns the parse tree for a regular expression.
+
+    Trees are cached by their canonical form (see 'TreeCache'). A tree is
+    described lazily as it is rendered, and is never changed by rendering,
+    so cached trees can be rendered any number of times.
+    '''
+    return tree_cache.get(regex_string, clean_quotes)
     
 # Translation functions.
 
 def regex_repeat(node):
-    node.sublist = True
-    node.subordinate = True
-    min, max = int(node.data[0]), int(node.data[1])
+    min, max = node.data[0], node.data[1]
     greed = " (non-greedy)" if node.token == "min_repeat" else ""
     if min == max:
         if min == 1:
@@ -242,21 +604,30 @@ def regex_repeat(node):
     return leadin
     
 
+def regex_words(node):
+    count = len(node.data)
+    words = [quoted(word) for word in node.data[:word_list_limit]]
+    if count > word_list_limit:
+        return "one of {0:,} words: {1}, ... ({2:,} more)".format(
+            count, ", ".join(words), count - word_list_limit)
+    words[-1] = "or " + words[-1]
+    return "one of the words " + (", " if count > 2 else " ").join(words)
+
+
 def regex_not_literal(node):
     return "any character except " + get_literals(node)
 
 
 def regex_literal(node):
-    if node.data[0] not in special_characters:
-        for sibling in node.younger_siblings():
-            if (sibling.token != 'literal' or sibling.data[0] in
-                special_characters):
-                break
-            node.data.extend(sibling.data)
-            sibling.detach()
     return get_literals(node)
 
 
+def plain_literal(node):
+    '''Whether a node is a literal that can be printed as it is.'''
+    return (node.token == 'literal' and
+            not any(ordinal in special_characters for ordinal in node.data))
+
+
 def get_literals(node):
     if len(node.data) == 1:
         for chardict in (special_characters, unusual_characters):
@@ -273,17 +644,9 @@ def get_literals(node):
             
  
 def regex_in(node):
-    node.sublist = True
-    node.vanishing = True
-    node.coordinate = True
-    if node.children[0].token == 'negate':
-        node.children[0].detach()
-        leadin = "any character except"
-        if node.children[0].token == 'category' and len(node.children) == 1:
-            node.children[0].data[0] = complements[node.children[0].data[0]]
-    else:
-        leadin = "one of the following:"
-    return leadin
+    if node.negated:
+        return "any character except"
+    return "one of the following:"
 
 
 def regex_category(node):
@@ -294,16 +657,9 @@ def regex_category(node):
 
 
 def regex_subpattern(node):
-    node.sublist = True
-    node.subordinate = True
     pattern_name = node.data[0]
     if pattern_name == 'None':
-        if node.children[0].token == 'groupref_exists':
-            child = node.children[0]
-            node.parent.replace(node, child)
-            return regex_groupref_exists(child)
-        else:
-            subpattern_intro = "a non-captured subgroup consisting of:"
+        subpattern_intro = "a non-captured subgroup consisting of:"
     else:
         subpattern_intro = "subgroup #{0}, consisting of:".format(pattern_name)
     return subpattern_intro
@@ -318,11 +674,8 @@ def regex_any(node):
 
 
 def regex_assert(node):
-    node.sublist = True
-    node.subordinate = True
-    node.parenthesized = True
     positive = node.token == 'assert'
-    lookahead = node.data[0] == '1'
+    lookahead = node.data[0] == 1
     direction = ("we could {0}now match:" if lookahead else
                  "we could {0}have just matched:")
     positivity = "" if positive else "not "
@@ -332,7 +685,6 @@ def regex_assert(node):
 
 
 def regex_branch(node):
-    node.subordinate = True
     return 'either:' if node.token == 'branch' else 'or:'
     
     
@@ -360,8 +712,6 @@ def regex_groupref_exists(node):
     include the branch marker between the true and false patterns, so they
     get run together.
     '''
-    node.sublist = True
-    node.subordinate = True
     condition = "(if group #{0} was found earlier) a subgroup consisting of:"
     return condition.format(node.data[0])
 
@@ -374,8 +724,6 @@ def regex_range(node):
     
 def start_tree(node):
     node.outro = "."
-    node.sublist = True
-    node.subordinate = True
     return "This regular expression will match:"
 
 # The translation dictionary. Dispatch table between regex parser elements
@@ -399,23 +747,88 @@ translation = {
     'range': regex_range,
     'groupref_exists': regex_groupref_exists,
     'start_tree': start_tree,
+    'words': regex_words,
+}
+
+# Output styles. Dispatch table between style names and functions that wrap
+# a description at a given depth and width into lines.
+
+styles = {
+    'text': wrap_text,
+    'markdown': wrap_markdown,
 }
 
-# The outward-facing function.
+# The outward-facing functions.
+
+class Summary(object):
+    '''A depth-limited translation of a parse tree.
+
+    The children of nodes 'max_depth' levels down are not described at all
+    until they are expanded; each of those nodes is printed with a handle,
+    which can be passed to 'expand' to translate the rest of its tree.
+    '''
+    __slots__ = ('text', 'folded', 'width', 'style')
+
+    def __init__(self, node, max_depth=None, width=70, style='text'):
+        '''Instantiates a Summary.
+
+        node: The root of the tree to translate.
+        max_depth: How many levels below 'node' to translate, or None.
+        width, style: As for 'RegexNode.render'.
+        '''
+        self.folded = []
+        self.width = width
+        self.style = style
+        self.text = node.render(width, style, max_depth, self.folded)
+
+    def expand(self, handle, max_depth=None):
+        '''Returns a Summary of the tree folded under the given handle.
+
+        The tree is translated on its own, as though it were the whole
+        regular expression, rather than as part of its parent's list.
+        '''
+        try:
+            node = self.folded[handle]
+        except (IndexError, TypeError) as exc:
+            raise ValueError("no folded subtree #{0}".format(handle)) from exc
+        return Summary(node, max_depth, self.width, self.style)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return "Summary ({0} folded)".format(len(self.folded))
+
 
 def check_for_quotes(string):
-    return quotes_regex.sub('\2', string)
+    return quotes_regex.sub(r'\2', string)
+
+
+def summarize(regex_string, max_depth=None, clean_quotes=True, width=70,
+              style='text'):
+    '''Returns a Summary of the translation for a regular expression.
+
+    max_depth: How many levels of the parse tree to translate; anything
+    deeper is folded until expanded. None translates everything.
+    clean_quotes: As for 'speak'.
+    width: The width to wrap lines to.
+    style: The name of an output style: 'text' or 'markdown'.
+    '''
+    tree = parse_tree(regex_string, clean_quotes)
+    return Summary(tree, max_depth, width, style)
 
 
-def speak(regex_string=None, clean_quotes=True):
+def speak(regex_string=None, clean_quotes=True, max_depth=None, width=70,
+          style='text'):
     '''Given a regular expression, prints the translation for that regular
     expression.
     
     clean_quotes: If true, checks if the given regular expression is enclosed
     in quotation marks and removes them before translating it.
+    max_depth: If given, only translates this many levels of the expression,
+    summarizing anything deeper. (See 'summarize'.)
+    width, style: How to format the translation. (See 'summarize'.)
     '''
     if regex_string is None:
         regex_string = input("Enter a regular expression:")
-    if clean_quotes:
-        regex_string = check_for_quotes(regex_string)
-    print(parse_tree(regex_string))
\ No newline at end of file
+    print(summarize(regex_string, max_depth, clean_quotes, width, style))
\ No newline at end of file
@@ -32,10 +32,9 @@ class Node(object):
             if self._parent is not None:
                 self._parent.remove(self)
             try:
+                node.children.append(self)
                 self._parent = node
-                node.add(self)
             except AttributeError as exc:
-                self._parent = None
                 raise ValueError("node parent must be node or None") from exc
     
     @property
@@ -45,8 +44,6 @@ class Node(object):
         
     def add(self, node):
         '''Adds the given node as a child of this one.'''
-        if node not in self.children:
-            self.children.append(node)
         node.parent = self
         return self
         
@@ -82,8 +79,15 @@ class Node(object):
         '''Replace a current child with a new child node.'''
         age = self.children.index(child)
         child.parent = None
-        self.children.insert(age, adoptee)
         adoptee.parent = self
+        self.children.insert(age, self.children.pop())
+
+    def clear(self):
+        '''Removes all of this node's children at once.'''
+        for child in self.children:
+            child._parent = None
+        self.children = []
+        return self
         
     def older_siblings(self):
         '''Yields this node's older siblings in increasing order of age.'''